@@ -1,70 +1,175 @@
-import argparse
+from __future__ import annotations
+
+import functools
 import time
 import json
 import os
 import sys
+import threading
 from datetime import timedelta
-from rich.console import Console
-from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn
-from rich.layout import Layout
-from rich.panel import Panel
+from typing import TYPE_CHECKING
+
+# Rich is imported inside the functions that use it to keep CLI startup fast.
+if TYPE_CHECKING:
+    from rich.console import Console
+    from rich.layout import Layout
+    from rich.panel import Panel
 
 # --- Configuration ---
 LOG_FILE = "pomodoro_log.json"
-API_KEY = "" 
+
+USAGE = "usage: pomodoro.py [-h] [-w WORK] [-b BREAK]"
+HELP = f"""{USAGE}
+
+Customizable Pomodoro Timer CLI (with Rich visualization and logging).
+
+options:
+  -h, --help            show this help message and exit
+  -w, --work WORK       Duration of the work session in minutes (default: 25).
+  -b, --break BREAK     Duration of the break session in minutes (default: 5).
+"""
 
 # --- Utility Functions ---
 
+@functools.lru_cache(maxsize=None)
+def _json_backend():
+    """
+    Returns the (loads, dumps) pair used for the log, resolved on first use.
+    orjson is optional; fall back to the stdlib json module when it is not installed.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return json.loads, lambda data: json.dumps(data, separators=(',', ':')).encode()
+    return orjson.loads, orjson.dumps
+
 def load_progress():
     """Loads total work time from the log file."""
+    if not os.path.exists(LOG_FILE):
+        return 0
     try:
-        with open(LOG_FILE, 'r') as f:
-            data = json.load(f)
-            return data.get('total_work_seconds', 0)
+        # Raw fd reads skip the buffered io stack; the log is normally a single read.
+        fd = os.open(LOG_FILE, os.O_RDONLY)
+        try:
+            read_size = max(os.fstat(fd).st_size, 4096)
+            chunks = []
+            while chunk := os.read(fd, read_size):
+                chunks.append(chunk)
+        finally:
+            os.close(fd)
+        raw = b''.join(chunks)
+        json_loads, _ = _json_backend()
+        data = json_loads(raw)
+        return data.get('total_work_seconds', 0)
     except (FileNotFoundError, json.JSONDecodeError):
         return 0
 
-def save_progress(new_work_seconds):
+def save_progress(new_work_seconds, current_total_seconds):
     """Saves updated total work time to the log file."""
-    total_seconds = load_progress() + new_work_seconds
+    if new_work_seconds <= 0:
+        return current_total_seconds
+    total_seconds = current_total_seconds + new_work_seconds
     data = {'total_work_seconds': total_seconds}
-    with open(LOG_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
+    _, json_dumps = _json_backend()
+    payload = json_dumps(data)
+    # Write to a temp file and rename over the log so a crash never leaves it truncated.
+    tmp_file = LOG_FILE + ".tmp"
+    with open(tmp_file, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_file, LOG_FILE)
     return total_seconds
 
-def play_alert():
+class PomodoroSession:
+    """
+    Tracks work time for a run, separating what is on disk from what is still pending.
+    Pending time is flushed after each work phase, on a background thread.
+    """
+
+    def __init__(self, saved_seconds: int):
+        self.saved_seconds = saved_seconds
+        self.pending_seconds = 0
+        self.flush_error = None
+        self._lock = threading.Lock()
+
+    @property
+    def total_seconds(self) -> int:
+        """Total work time, including time not yet written to the log."""
+        # flush() moves time between the two fields, so read them under the same lock.
+        with self._lock:
+            return self.saved_seconds + self.pending_seconds
+
+    def record_work(self, seconds: int):
+        """Adds a completed work phase to the in-memory total."""
+        with self._lock:
+            self.pending_seconds += seconds
+
+    def flush(self):
+        """Writes any pending work time to the log. Safe to call repeatedly."""
+        with self._lock:
+            self.saved_seconds = save_progress(self.pending_seconds, self.saved_seconds)
+            self.pending_seconds = 0
+
+    def background_flush(self):
+        """Thread target for flush(); keeps any error for the main thread to re-raise after join()."""
+        try:
+            self.flush()
+        except Exception as exc:
+            self.flush_error = exc
+
+@functools.lru_cache(maxsize=128)
+def _fmt_seconds(seconds: int) -> str:
+    """Format a second count as H:MM:SS, cached since the footer repeats values."""
+    return str(timedelta(seconds=seconds))
+
+def play_alert(console: Console):
     """
     Plays an alert sound using the terminal bell character.
     This is the most reliable method in WSL.
     """
-    sys.stdout.write('\007')
-    sys.stdout.flush()
-    print("\n[Alert] Phase complete!")
+    try:
+        try:
+            os.write(sys.stdout.fileno(), b'\a')
+        except (AttributeError, ValueError):
+            # Captured or wrapped stdout has no real fd (io.UnsupportedOperation is a ValueError).
+            console.file.write('\a')
+            console.file.flush()
+    except OSError:
+        # A broken pipe or closed stdout shouldn't abort the session just to ring the bell.
+        pass
+    console.print("\n[Alert] Phase complete!", markup=False)
+
+def make_layout() -> tuple[Layout, Panel, Panel]:
+    """Define the overall layout for Rich, returning it with its header and footer panels."""
+    from rich.layout import Layout
+    from rich.panel import Panel
 
-def make_layout() -> Layout:
-    """Define the overall layout for Rich."""
+    # Panels are built once here; the update helpers only swap their contents.
+    header_panel = Panel("", title="🍅 Session Info", border_style="dim")
+    footer_panel = Panel("", title="📊 Progress Log", border_style="dim")
     layout = Layout(name="root")
     layout.split(
-        Layout(name="header", size=3),
+        Layout(header_panel, name="header", size=3),
         Layout(name="main"),
-        Layout(name="footer", size=5)
+        Layout(footer_panel, name="footer", size=5)
     )
-    return layout
+    return layout, header_panel, footer_panel
 
-def update_header(layout: Layout, phase: str, duration_minutes: int):
+def update_header(header_panel: Panel, phase: str, duration_minutes: int):
     """Update the header with current phase information."""
     color = "bold yellow" if phase == "Work" else "bold green"
     header_content = f"[{color}]Pomodoro Timer CLI[/]\n[white]{phase} Phase: {duration_minutes} Minutes[/]"
-    layout["header"].update(Panel(header_content, title="🍅 Session Info", border_style="dim"))
+    header_panel.renderable = header_content
 
-def update_footer(layout: Layout, total_seconds: int):
+def update_footer(footer_panel: Panel, total_seconds: int):
     """Update the footer with total tracked work time."""
-    total_time = str(timedelta(seconds=total_seconds))
+    total_time = _fmt_seconds(total_seconds)
     footer_content = f"[bold cyan]Total Tracked Work Time: {total_time}[/]"
-    layout["footer"].update(Panel(footer_content, title="📊 Progress Log", border_style="dim"))
+    footer_panel.renderable = footer_content
 
-def run_timer(duration_seconds: int, phase: str, layout: Layout):
+def run_timer(duration_seconds: int, phase: str, layout: Layout, console: Console):
     """Runs the rich animated countdown for a specific phase."""
+    from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn
+
     task_columns = [
         TextColumn("[bold magenta]{task.description}", justify="right"),
         BarColumn(bar_width=None),
@@ -74,59 +179,116 @@ def run_timer(duration_seconds: int, phase: str, layout: Layout):
         "•",
         TextColumn("[green]{task.completed}/{task.total}s"),
     ]
-    console = Console()
-    with Progress(*task_columns, console=console, transient=True) as progress:
+    start = time.monotonic()
+    end = start + duration_seconds
+    with Progress(*task_columns, console=console, transient=True, refresh_per_second=4) as progress:
         task = progress.add_task(f"[bold white]{phase} Countdown...", total=duration_seconds)
-        while not progress.finished:
-            progress.update(task, advance=1)
-            time.sleep(1)
+        # Progress is derived from the monotonic clock, so sleep overruns never accumulate as drift.
+        completed = 0
+        remaining = end - time.monotonic()
+        while remaining > 0:
+            elapsed = min(int(time.monotonic() - start), duration_seconds)
+            if elapsed != completed:
+                completed = elapsed
+                progress.update(task, completed=completed)
+            time.sleep(min(0.25, remaining))
+            remaining = end - time.monotonic()
+        progress.update(task, completed=duration_seconds)
 
-def main():
-    parser = argparse.ArgumentParser(description="Customizable Pomodoro Timer CLI (with Rich visualization and logging).")
-    
-    # Fix: use dest="work_duration" and dest="break_duration" to avoid Python keyword conflicts
-    parser.add_argument('-w', '--work', dest="work_duration", type=int, default=25,
-                        help="Duration of the work session in minutes (default: 25).")
-    
-    parser.add_argument('-b', '--break', dest="break_duration", type=int, default=5,
-                        help="Duration of the break session in minutes (default: 5).")
-                        
-    args = parser.parse_args()
+def usage_error(message: str):
+    """Print an argparse-style usage error and exit with status 2."""
+    sys.stderr.write(f"{USAGE}\npomodoro.py: error: {message}\n")
+    sys.exit(2)
+
+def _is_int(value: str) -> bool:
+    """True if value parses as an int (so '-5' is a value, not a flag)."""
+    try:
+        int(value)
+    except ValueError:
+        return False
+    return True
+
+def parse_args(argv: list[str]) -> tuple[int, int]:
+    """
+    Parses the work and break durations (in minutes) from the command line.
+    Hand-rolled instead of argparse, which costs more to import than the whole CLI needs.
+    """
+    work_duration = 25
+    break_duration = 5
+    it = iter(argv)
+    for arg in it:
+        if arg in ('-h', '--help'):
+            sys.stdout.write(HELP)
+            sys.exit(0)
+        if arg[:2] in ('-w', '-b') and len(arg) > 2:
+            # Attached short-option value, e.g. -w5 or -w=5.
+            flag, value = arg[:2], arg[2:]
+            if value.startswith('='):
+                value = value[1:]
+        else:
+            flag, sep, value = arg.partition('=')
+            if flag not in ('-w', '--work', '-b', '--break'):
+                usage_error(f"unrecognized arguments: {arg}")
+            if not sep:
+                value = next(it, None)
+                if value is None or (value.startswith('-') and not _is_int(value)):
+                    usage_error(f"argument {flag}: expected one argument")
+        try:
+            minutes = int(value)
+        except ValueError:
+            usage_error(f"argument {flag}: invalid int value: '{value}'")
+        if flag in ('-w', '--work'):
+            work_duration = minutes
+        else:
+            break_duration = minutes
+    return work_duration, break_duration
 
-    work_duration = args.work_duration
-    break_duration = args.break_duration 
+def main():
+    work_duration, break_duration = parse_args(sys.argv[1:])
 
     work_seconds = work_duration * 60
     break_seconds = break_duration * 60
 
+    from rich.console import Console
+    from rich.panel import Panel
+
     console = Console()
-    layout = make_layout()
+    layout, header_panel, footer_panel = make_layout()
     
-    total_tracked_seconds = load_progress()
-    update_footer(layout, total_tracked_seconds)
+    session = PomodoroSession(load_progress())
+    update_footer(footer_panel, session.total_seconds)
     console.print(layout)
 
     try:
         # Work Phase
-        update_header(layout, "Work", work_duration)
-        run_timer(work_seconds, "Work", layout)
-        total_tracked_seconds = save_progress(work_seconds)
-        update_footer(layout, total_tracked_seconds)
+        update_header(header_panel, "Work", work_duration)
+        run_timer(work_seconds, "Work", layout, console)
+        session.record_work(work_seconds)
+        update_footer(footer_panel, session.total_seconds)
+        # Write the log in the background while the user reads the alert.
+        save_thread = threading.Thread(target=session.background_flush)
+        save_thread.start()
         console.print(Panel("[bold yellow]🚨 WORK TIME COMPLETE! Take a break.[/]", border_style="yellow"))
-        play_alert()
+        play_alert(console)
 
         time.sleep(2) 
+        save_thread.join()
+        if session.flush_error is not None:
+            raise session.flush_error
 
         # Break Phase
-        update_header(layout, "Break", break_duration)
-        run_timer(break_seconds, "Break", layout)
+        update_header(header_panel, "Break", break_duration)
+        run_timer(break_seconds, "Break", layout, console)
         console.print(Panel("[bold green]✅ BREAK TIME COMPLETE! Ready for the next session.[/]", border_style="green"))
-        play_alert()
+        play_alert(console)
 
     except KeyboardInterrupt:
         console.print("\n[bold red]Timer interrupted. Session stopped.[/]")
         
     finally:
+        # Don't retry a write that already failed; report the first error and still show the layout.
+        if session.flush_error is None:
+            session.flush()
         console.print(layout) 
 
 if __name__ == "__main__":